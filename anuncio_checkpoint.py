@@ -0,0 +1,248 @@
+"""
+Checkpoints do pipeline diário para retomada rápida após reinício do app.
+
+Cada checkpoint guarda, para um dia, o estado já resolvido do pipeline:
+origem e impressão digital da planilha, tabela de efetivo, mapa de
+cabeçalhos do formulário, respostas do dia e períodos aplicados. Cada etapa
+leva a impressão digital das suas entradas, e `executar_pipeline` só refaz
+as etapas cujas entradas mudaram.
+
+Formato em disco: `MAGIC` + versão + JSON comprimido com zlib, gravado de
+forma atômica (arquivo temporário + os.replace). Datas viram texto ISO e os
+períodos viram listas [início, fim]; a conversão é desfeita na leitura.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from datetime import date
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from anuncio_core import (
+    carregar_efetivo_do_df,
+    filtrar_respostas_do_dia,
+    ler_abas_obrigatorias,
+    preparar_formulario,
+    processar_respostas,
+    resolver_cabecalhos,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# =========================
+# CONFIG
+# =========================
+CHECKPOINT_DIR = os.environ.get(
+    "ANUNCIO_CHECKPOINT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".checkpoints"),
+)
+CHECKPOINTS_MANTIDOS = 7
+
+MAGIC  = b"ACSC"
+VERSAO = 2
+
+
+# =========================
+# IMPRESSÕES DIGITAIS
+# =========================
+def fingerprint_bytes(conteudo: bytes) -> str:
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def fingerprint_partes(*partes) -> str:
+    h = hashlib.sha256()
+    for p in partes:
+        h.update(repr(p).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def fingerprint_df(df: "pd.DataFrame") -> str:
+    """Impressão digital estável do conteúdo (colunas, índice e valores) de um DataFrame."""
+    import pandas as pd
+
+    h = hashlib.sha256()
+    h.update(repr([str(c) for c in df.columns]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df.astype(str), index=True).values.tobytes())
+    return h.hexdigest()
+
+
+# =========================
+# PIPELINE POR ETAPAS
+# =========================
+def executar_pipeline(
+    df_formulario:  "pd.DataFrame",
+    df_efetivo_raw: "pd.DataFrame",
+    dia:            date,
+    fonte:          Optional[str] = None,
+    anterior:       Optional[Dict] = None
+) -> Tuple[Dict, List[str]]:
+    """
+    Executa o pipeline do dia reaproveitando as etapas de `anterior` cujas
+    entradas não mudaram. `df_formulario` deve vir de `preparar_formulario`.
+
+    Retorna (estado, etapas_refeitas).
+    """
+    anterior = anterior or {}
+    refeitas = []
+
+    fp_efetivo = fingerprint_df(df_efetivo_raw)
+    if anterior.get("fp_efetivo") == fp_efetivo:
+        efetivo_dict = anterior["efetivo_dict"]
+    else:
+        efetivo_dict = carregar_efetivo_do_df(df_efetivo_raw)
+        refeitas.append("efetivo")
+
+    fp_cabecalhos = fingerprint_partes(fp_efetivo, [str(c) for c in df_formulario.columns[4:]])
+    if anterior.get("fp_cabecalhos") == fp_cabecalhos:
+        cabecalhos = anterior["cabecalhos"]
+    else:
+        cabecalhos = resolver_cabecalhos(df_formulario.columns, efetivo_dict)
+        refeitas.append("cabecalhos")
+
+    df_hoje      = filtrar_respostas_do_dia(df_formulario, dia)
+    fp_respostas = fingerprint_partes(fp_cabecalhos, dia, fingerprint_df(df_hoje))
+    if anterior.get("fp_respostas") == fp_respostas:
+        registros      = anterior["registros"]
+        respostas_dict = anterior["respostas_dict"]
+        periodos_aplicados = anterior.get("periodos_aplicados", False)
+        periodos_inseridos = anterior.get("periodos_inseridos", {})
+    else:
+        registros      = len(df_hoje)
+        respostas_dict = processar_respostas(df_hoje, efetivo_dict, cabecalhos)
+        periodos_aplicados = False
+        periodos_inseridos = {}
+        refeitas.append("respostas")
+
+    estado = {
+        "dia":                dia,
+        "origem":             None,
+        "fonte":              fonte,
+        "fp_efetivo":         fp_efetivo,
+        "efetivo_dict":       efetivo_dict,
+        "fp_cabecalhos":      fp_cabecalhos,
+        "cabecalhos":         cabecalhos,
+        "fp_respostas":       fp_respostas,
+        "registros":          registros,
+        "respostas_dict":     respostas_dict,
+        "periodos_aplicados": periodos_aplicados,
+        "periodos_inseridos": periodos_inseridos,
+    }
+    return estado, refeitas
+
+
+def atualizar_estado(
+    conteudo: bytes,
+    dia:      date,
+    anterior: Optional[Dict] = None,
+    origem:   Optional[str] = None
+) -> Tuple[Dict, List[str]]:
+    """
+    Atualiza o estado do dia a partir dos bytes XLSX da planilha. `origem`
+    (URL da planilha ou descrição do upload) fica registrada no estado.
+
+    Se a planilha e o dia são os mesmos de `anterior`, reaproveita-o sem nem
+    ler o XLSX. Caso contrário, lê as abas e executa `executar_pipeline`.
+    """
+    fonte = fingerprint_bytes(conteudo)
+    if anterior and anterior.get("fonte") == fonte and anterior.get("dia") == dia:
+        if anterior.get("origem") == origem:
+            return anterior, []
+        return dict(anterior, origem=origem), []
+
+    df_formulario, df_efetivo_raw = ler_abas_obrigatorias(conteudo)
+    estado, refeitas = executar_pipeline(
+        preparar_formulario(df_formulario), df_efetivo_raw, dia, fonte, anterior
+    )
+    estado["origem"] = origem
+    return estado, refeitas
+
+
+def descartar_periodos(estado: Dict) -> Dict:
+    """Cópia do estado sem os períodos aplicados, para que sejam informados de novo."""
+    return dict(estado, periodos_aplicados=False, periodos_inseridos={})
+
+
+# =========================
+# LEITURA / GRAVAÇÃO
+# =========================
+def estado_para_json(estado: Dict) -> Dict:
+    return dict(
+        estado,
+        dia=estado["dia"].isoformat(),
+        periodos_inseridos={
+            chave: [ini.isoformat(), fim.isoformat()]
+            for chave, (ini, fim) in estado["periodos_inseridos"].items()
+        },
+    )
+
+
+def estado_de_json(dados: Dict) -> Dict:
+    return dict(
+        dados,
+        dia=date.fromisoformat(dados["dia"]),
+        periodos_inseridos={
+            chave: (date.fromisoformat(ini), date.fromisoformat(fim))
+            for chave, (ini, fim) in dados["periodos_inseridos"].items()
+        },
+    )
+
+
+def caminho_checkpoint(dia: date, diretorio: Optional[str] = None) -> str:
+    return os.path.join(diretorio or CHECKPOINT_DIR, f"anuncio_{dia.strftime('%Y%m%d')}.ckpt")
+
+
+def salvar_checkpoint(estado: Dict, diretorio: Optional[str] = None) -> str:
+    """Grava o estado de forma atômica e remove checkpoints antigos."""
+    diretorio = diretorio or CHECKPOINT_DIR
+    os.makedirs(diretorio, exist_ok=True)
+    destino = caminho_checkpoint(estado["dia"], diretorio)
+
+    dados = MAGIC + bytes([VERSAO]) + zlib.compress(
+        json.dumps(estado_para_json(estado), ensure_ascii=False).encode("utf-8"), 6
+    )
+
+    fd, tmp = tempfile.mkstemp(prefix=".anuncio_", suffix=".tmp", dir=diretorio)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(dados)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, destino)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    antigos = sorted(
+        n for n in os.listdir(diretorio)
+        if n.startswith("anuncio_") and n.endswith(".ckpt")
+    )
+    for nome in antigos[:-CHECKPOINTS_MANTIDOS]:
+        try:
+            os.remove(os.path.join(diretorio, nome))
+        except OSError:
+            pass
+    return destino
+
+
+def carregar_checkpoint(dia: date, diretorio: Optional[str] = None) -> Optional[Dict]:
+    """Carrega o checkpoint de `dia`, ou None se não existir ou estiver inválido."""
+    try:
+        with open(caminho_checkpoint(dia, diretorio), "rb") as f:
+            dados = f.read()
+    except OSError:
+        return None
+
+    if dados[:len(MAGIC)] != MAGIC or dados[len(MAGIC):len(MAGIC) + 1] != bytes([VERSAO]):
+        return None
+    try:
+        estado = estado_de_json(json.loads(zlib.decompress(dados[len(MAGIC) + 1:])))
+    except (zlib.error, ValueError, TypeError, KeyError, AttributeError):
+        return None
+    if estado["dia"] != dia:
+        return None
+    return estado
@@ -0,0 +1,544 @@
+"""
+Núcleo do gerador de anúncio CSC-PM, sem dependência de Streamlit.
+
+Pode ser importado por scripts, testes e rotinas agendadas sem pagar o custo
+de importação da UI. pandas, requests e difflib só são importados na primeira
+chamada das funções que os utilizam.
+"""
+import io
+import re
+import unicodedata
+from datetime import date
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# =========================
+# CONFIG
+# =========================
+DEFAULT_SHEET_URL = "https://docs.google.com/spreadsheets/d/10izQWPLAk3nv46Pl7ShzchReY3SjZdDl9KgboGQMAWg/edit?usp=sharing"
+SHEET_ID_PATTERN  = re.compile(r"/spreadsheets/d/([a-zA-Z0-9-_]+)")
+
+# Nome exato da aba de efetivo na planilha Google Sheets
+ABA_EFETIVO    = "EFETIVO CSC"
+# Nome exato da aba de respostas do formulário
+ABA_FORMULARIO = "Respostas ao formulário 1"
+
+
+# =========================
+# CONSTANTES
+# =========================
+QUADRO_CATEGORIA = {
+    "QOPM": "OFICIAIS", "QOR": "OFICIAIS", "QOC": "OFICIAIS",
+    "QPEP": "OFICIAIS",
+    "QPR": "PRAÇAS", "QPPM": "PRAÇAS", "QPE": "PRAÇAS",
+    "CIVIL": "CIVIS"
+}
+
+STATUS_KEYWORDS = [
+    (["férias", "ferias"], 1),
+    (["licença", "licenca"], 2),
+    (["ausente"], 3),
+    (["folga"], 4),
+    (["dispensa"], 5),
+    (["presente"], 6),
+]
+
+STAR_TOKEN_PATTERN = re.compile(r"\*([^*]+)\*")
+
+POSTO_PATTERNS = [
+    (re.compile(r'^[\s]*ASPM[\s]+',                re.IGNORECASE), ''),
+    (re.compile(r'^[\s]*Asp[\s]+a[\s]+Of[\s]+',    re.IGNORECASE), ''),
+    (re.compile(r'^[\s]*\d+[º°][\s]*',             re.IGNORECASE), ''),
+    (re.compile(r'^[\s]*(TEN[\s]*CEL|MAJ|CAP|SUB[\s]*TENENTE|SUBTENENTE|TEN|SGT|CB)[\s]+',
+                re.IGNORECASE), ''),
+    (re.compile(r'^[\s]*\d+[º°]?(TEN|SGT)[\s]+',  re.IGNORECASE), ''),
+]
+
+RANK_OFICIAIS = {
+    "TEN CEL": 10, "TENENTE CORONEL": 10,
+    "MAJ": 20,     "MAJOR": 20,
+    "CAP": 30,     "CAPITAO": 30,
+    "1° TEN": 40,  "1 TEN": 40,  "PRIMEIRO TENENTE": 40,
+    "2° TEN": 50,  "2 TEN": 50,  "SEGUNDO TENENTE": 50,
+    "ASP A OF": 60, "ASP": 60,
+}
+
+RANK_PRACAS = {
+    "SUBTEN": 10,  "SUB TEN": 10,  "SUBTENENTE": 10,
+    "1° SGT": 20,  "1 SGT": 20,    "1 SARGENTO": 20,
+    "2° SGT": 30,  "2 SGT": 30,    "2 SARGENTO": 30,
+    "3° SGT": 40,  "3 SGT": 40,    "3 SARGENTO": 40,
+    "CB": 50,      "CABO": 50,
+    "SD": 60,      "SOLDADO": 60,
+}
+
+
+# =========================
+# GOOGLE SHEETS
+# =========================
+def extrair_sheet_id(url: str) -> str:
+    m = SHEET_ID_PATTERN.search(str(url))
+    return m.group(1) if m else ""
+
+
+def montar_url_export(sheet_id: str) -> str:
+    return f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=xlsx"
+
+
+def baixar_aba_xlsx(sheet_id: str, nome_aba: str) -> bytes:
+    """Baixa uma aba específica da planilha via export."""
+    import requests
+
+    # Primeiro precisamos descobrir o gid da aba
+    r = requests.get(montar_url_export(sheet_id), timeout=30)
+    r.raise_for_status()
+    return r.content
+
+
+def baixar_planilha_xlsx(sheet_url: str) -> bytes:
+    """Baixa a planilha completa no formato XLSX e retorna os bytes brutos."""
+    import requests
+
+    sheet_id = extrair_sheet_id(sheet_url)
+    if not sheet_id:
+        raise ValueError("Não foi possível extrair o ID da planilha.")
+
+    r = requests.get(montar_url_export(sheet_id), timeout=30)
+    r.raise_for_status()
+    return r.content
+
+
+def ler_planilha_xlsx(conteudo: bytes) -> Dict[str, "pd.DataFrame"]:
+    """Converte os bytes XLSX em dict {nome_aba: DataFrame}."""
+    import pandas as pd
+
+    xlsx = pd.ExcelFile(io.BytesIO(conteudo))
+    abas = {}
+    for nome in xlsx.sheet_names:
+        abas[nome] = xlsx.parse(nome)
+    return abas
+
+
+def localizar_abas(abas_disponiveis: List[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Retorna (aba_formulario, aba_efetivo) encontradas entre os nomes dados."""
+    aba_form = next((a for a in abas_disponiveis if ABA_FORMULARIO.lower() in a.lower()), None)
+    aba_efet = next((a for a in abas_disponiveis if ABA_EFETIVO.lower()   in a.lower()), None)
+    return aba_form, aba_efet
+
+
+def ler_abas_obrigatorias(conteudo: bytes) -> Tuple["pd.DataFrame", "pd.DataFrame"]:
+    """
+    Lê os bytes XLSX e retorna (df_formulario, df_efetivo_raw), sem tratamento.
+    Levanta ValueError se alguma das duas abas não existir.
+    """
+    abas = ler_planilha_xlsx(conteudo)
+    abas_disponiveis = list(abas.keys())
+    aba_form, aba_efet = localizar_abas(abas_disponiveis)
+    if not aba_form:
+        raise ValueError(
+            f"Aba de formulário não encontrada. Abas disponíveis: {abas_disponiveis}. "
+            f"Esperado: '{ABA_FORMULARIO}'"
+        )
+    if not aba_efet:
+        raise ValueError(
+            f"Aba de efetivo não encontrada. Abas disponíveis: {abas_disponiveis}. "
+            f"Esperado: '{ABA_EFETIVO}' — crie essa aba no Sheets."
+        )
+    return abas[aba_form], abas[aba_efet]
+
+
+# =========================
+# AUXILIARES
+# =========================
+def remover_asteriscos(s: str) -> str:
+    return s.replace("*", "") if s else ""
+
+
+def remover_acentos(s: str) -> str:
+    return "".join(
+        ch for ch in unicodedata.normalize("NFKD", s)
+        if not unicodedata.combining(ch)
+    )
+
+
+def normalizar_nome(nome: str) -> str:
+    if not isinstance(nome, str):
+        import pandas as pd
+        if pd.isna(nome):
+            return ""
+    s = remover_asteriscos(str(nome)).strip().upper()
+    s = remover_acentos(s)
+    s = re.sub(r"[^A-Z\s]", " ", s)
+    return re.sub(r"\s+", " ", s).strip()
+
+
+def normalizar_posto_display(posto: str) -> str:
+    s = str(posto).strip().replace("º", "°")
+    return re.sub(r"\s+", " ", s).strip()
+
+
+def extrair_nome_completo_da_coluna(nome_coluna: str) -> str:
+    s   = str(nome_coluna).strip()
+    idx = s.upper().rfind(" PM ")
+    if idx != -1:
+        return s[idx + 4:].strip()
+    for pattern, repl in POSTO_PATTERNS:
+        s = pattern.sub(repl, s)
+    return s.strip()
+
+
+def similaridade(a: str, b: str) -> float:
+    from difflib import SequenceMatcher
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def encontrar_militar(
+    nome_extraido: str,
+    efetivo_dict: Dict,
+    limiar: float = 0.88
+) -> Tuple[Optional[str], Optional[Dict]]:
+    nome_norm = normalizar_nome(nome_extraido)
+    if nome_norm in efetivo_dict:
+        return nome_norm, efetivo_dict[nome_norm]
+
+    melhor_key, melhor_score = None, 0.0
+    for key in efetivo_dict:
+        sc = similaridade(nome_norm, key)
+        if sc > melhor_score:
+            melhor_score = sc
+            melhor_key   = key
+
+    if melhor_key and melhor_score >= limiar:
+        return melhor_key, efetivo_dict[melhor_key]
+    return None, None
+
+
+# =========================
+# EXIBIÇÃO
+# =========================
+def extrair_tokens_negrito(texto: str) -> List[str]:
+    if not texto:
+        return []
+    return [
+        f"*{m.group(1).strip()}*"
+        for m in STAR_TOKEN_PATTERN.finditer(str(texto))
+        if m.group(1).strip()
+    ]
+
+
+def formatar_nome_posto_somente_negritos(dados: Dict) -> str:
+    posto_tokens = extrair_tokens_negrito(str(dados.get("posto_display", "")))
+    nome_tokens  = extrair_tokens_negrito(str(dados.get("nome_display",  "")))
+    posto_out    = posto_tokens[0] if posto_tokens else dados.get("posto_display", "")
+    nome_out     = " ".join(nome_tokens) if nome_tokens else dados.get("nome_display", "")
+    return f"{posto_out}, {nome_out}".strip()
+
+
+# =========================
+# STATUS / PERÍODOS
+# =========================
+def classificar_status(resp: str) -> Tuple[str, int]:
+    rl = str(resp).strip().lower()
+    if rl == "presente":           return "Presente", 6
+    if rl == "ausente":            return "Ausente",  3
+    if rl == "folga":              return "Folga",    4
+    if "dispensa" in rl:           return "Dispensa pela Chefia", 5
+    for kws, pri in STATUS_KEYWORDS:
+        if any(k in rl for k in kws):
+            return str(resp).strip(), pri
+    return str(resp).strip(), 50
+
+
+def precisa_periodo(status: str) -> bool:
+    sl = str(status).lower()
+    return "férias" in sl or "ferias" in sl or "licença" in sl or "licenca" in sl
+
+
+def validar_periodo(inicio: date, fim: date) -> bool:
+    return fim >= inicio
+
+
+def formatar_periodo(inicio: date, fim: date) -> str:
+    return f"{inicio.strftime('%d/%m/%Y')} a {fim.strftime('%d/%m/%Y')}"
+
+
+def ordem_status(s: str) -> int:
+    sl = str(s).lower()
+    for kws, pri in STATUS_KEYWORDS:
+        if any(k in sl for k in kws):
+            return pri
+    return 50
+
+
+# =========================
+# RANKING HIERÁRQUICO
+# =========================
+def limpar_para_ranking(texto: str) -> str:
+    s = remover_asteriscos(str(texto)).upper().strip()
+    s = remover_acentos(s)
+    s = s.replace("º", "°")
+    return re.sub(r"\s+", " ", s).strip()
+
+
+def rank_hierarquico(dados: Dict) -> int:
+    categoria = dados.get("categoria", "")
+    chave     = limpar_para_ranking(dados.get("posto_display", ""))
+    chave     = re.sub(r"(\d+)°(TEN|SGT)", r"\1° \2", chave)
+
+    tabela = RANK_OFICIAIS if categoria == "OFICIAIS" else (
+             RANK_PRACAS   if categoria == "PRAÇAS"   else {})
+
+    if chave in tabela:
+        return tabela[chave]
+    for k, v in tabela.items():
+        if k in chave:
+            return v
+    return 999 if categoria == "CIVIS" else 900
+
+
+# =========================
+# CONVERSÃO DE DATAS
+# =========================
+def to_datetime_safe(series: "pd.Series") -> "pd.Series":
+    import pandas as pd
+    s_num   = pd.to_numeric(series, errors="coerce")
+    s_excel = pd.to_datetime(s_num, unit="D", origin="1899-12-30", errors="coerce")
+    s_str   = pd.to_datetime(series, errors="coerce", dayfirst=True)
+    return s_excel.combine_first(s_str)
+
+
+# =========================
+# FORMULÁRIO
+# =========================
+COLUNAS_OBRIGATORIAS_FORMULARIO = {"Carimbo de data/hora", "Data do anúncio", "Seção:"}
+
+
+def preparar_formulario(df_formulario: "pd.DataFrame") -> "pd.DataFrame":
+    """Valida as colunas obrigatórias e converte as colunas de data (cópia)."""
+    faltando = COLUNAS_OBRIGATORIAS_FORMULARIO - set(df_formulario.columns.astype(str))
+    if faltando:
+        raise ValueError(
+            f"Colunas obrigatórias ausentes na aba de formulário: {', '.join(sorted(faltando))}"
+        )
+
+    df = df_formulario.copy()
+    df["Carimbo de data/hora"] = to_datetime_safe(df["Carimbo de data/hora"])
+    df["Data do anúncio"]      = to_datetime_safe(df["Data do anúncio"])
+    return df
+
+
+def filtrar_respostas_do_dia(df_formulario: "pd.DataFrame", dia: date) -> "pd.DataFrame":
+    """
+    Retorna as respostas de `dia`, da mais recente para a mais antiga.
+    Espera um DataFrame já passado por `preparar_formulario`.
+    """
+    df_hoje = df_formulario[df_formulario["Data do anúncio"].dt.date == dia].copy()
+    return df_hoje.sort_values("Carimbo de data/hora", ascending=False)
+
+
+# =========================
+# CARREGAR EFETIVO DO SHEETS
+# =========================
+def carregar_efetivo_do_df(df_raw: "pd.DataFrame") -> Dict:
+    """
+    Lê o DataFrame da aba EFETIVO e monta o dicionário de militares.
+
+    Formato esperado da aba (colunas obrigatórias):
+        SEÇÃO | NÚMERO | P / G | QUADRO | NOME
+
+    A coluna NOME aceita asteriscos para negrito WhatsApp, ex:
+        *LEONARDO* de *CASTRO* Ferreira
+    """
+    # Normalizar nomes de colunas (remover espaços extras)
+    df = df_raw.copy()
+    df.columns = [str(c).strip() for c in df.columns]
+
+    # Aceitar variações do cabeçalho "P  / G" ou "P / G"
+    col_posto = next(
+        (c for c in df.columns if re.match(r"P\s*/\s*G", c, re.IGNORECASE)), None
+    )
+    if col_posto is None:
+        raise ValueError(
+            "Coluna de posto/graduação não encontrada na aba de efetivo. "
+            "Certifique-se de que existe uma coluna com cabeçalho 'P / G'."
+        )
+
+    colunas_necessarias = ["SEÇÃO", "NÚMERO", "QUADRO", "NOME", col_posto]
+    for c in colunas_necessarias:
+        if c not in df.columns:
+            raise ValueError(f"Coluna obrigatória ausente na aba de efetivo: '{c}'")
+
+    efetivo_dict = {}
+    for _, row in df.iterrows():
+        quadro    = str(row["QUADRO"]).strip().upper()
+        categoria = QUADRO_CATEGORIA.get(quadro)
+        if not categoria:
+            continue  # linha em branco ou quadro desconhecido
+
+        nome_display  = str(row["NOME"]).strip()
+        posto_display = normalizar_posto_display(str(row[col_posto]))
+        nome_norm     = normalizar_nome(nome_display)
+
+        if not nome_norm:
+            continue
+
+        efetivo_dict[nome_norm] = {
+            "categoria":     categoria,
+            "posto_display": posto_display,
+            "nome_display":  nome_display,
+            "quadro":        quadro,
+            "secao":         str(row["SEÇÃO"]).strip().upper(),
+        }
+
+    return efetivo_dict
+
+
+# =========================
+# PROCESSAMENTO
+# =========================
+def resolver_cabecalhos(colunas, efetivo_dict: Dict) -> Dict[str, Optional[str]]:
+    """
+    Associa cada coluna de resposta do formulário (da 5ª em diante) à chave do
+    militar no efetivo, ou None quando não há correspondência.
+    """
+    cabecalhos = {}
+    for col in list(colunas)[4:]:
+        nome_extraido = extrair_nome_completo_da_coluna(str(col).strip())
+        chave, _      = encontrar_militar(nome_extraido, efetivo_dict)
+        cabecalhos[str(col)] = chave
+    return cabecalhos
+
+
+def processar_respostas(
+    df_hoje:      "pd.DataFrame",
+    efetivo_dict: Dict,
+    cabecalhos:   Optional[Dict[str, Optional[str]]] = None
+) -> Dict:
+    import pandas as pd
+
+    if cabecalhos is None:
+        cabecalhos = resolver_cabecalhos(df_hoje.columns, efetivo_dict)
+
+    respostas_dict     = {}
+    secoes_processadas = set()
+
+    for _, row in df_hoje.iterrows():
+        secao = str(row["Seção:"])
+        if secao in secoes_processadas:
+            continue
+        secoes_processadas.add(secao)
+
+        for col in df_hoje.columns[4:]:
+            valor = row[col]
+            if pd.isna(valor) or str(valor).strip() == "":
+                continue
+
+            chave = cabecalhos.get(str(col))
+            if chave is None or chave not in efetivo_dict:
+                continue
+
+            candidatos = [classificar_status(r.strip())
+                          for r in str(valor).strip().split(",") if r.strip()]
+            if candidatos:
+                status = min(candidatos, key=lambda x: x[1])[0]
+                respostas_dict[chave] = {"status": status, "dados": efetivo_dict[chave]}
+
+    return respostas_dict
+
+
+def organizar_categorias(
+    efetivo_dict:       Dict,
+    respostas_dict:     Dict,
+    periodos_inseridos: Dict
+) -> Tuple[Dict, Dict, List[str]]:
+    categorias_dados = {
+        cat: {"presentes": [], "afastamentos": {}, "total": 0}
+        for cat in ["OFICIAIS", "PRAÇAS", "CIVIS"]
+    }
+    faltantes_por_secao      = {}
+    militares_nao_informados = []
+
+    for nome_norm, dados in efetivo_dict.items():
+        categoria = dados["categoria"]
+        categorias_dados[categoria]["total"] += 1
+
+        resposta = respostas_dict.get(nome_norm)
+        if not resposta:
+            secao = dados.get("secao", "SEM SEÇÃO")
+            faltantes_por_secao[secao] = faltantes_por_secao.get(secao, 0) + 1
+            militares_nao_informados.append(
+                f"{formatar_nome_posto_somente_negritos(dados)} ({secao})"
+            )
+            continue
+
+        status    = str(resposta["status"]).strip()
+        disp_base = formatar_nome_posto_somente_negritos(dados)
+        rank      = rank_hierarquico(dados)
+
+        if precisa_periodo(status) and nome_norm in periodos_inseridos:
+            ini, fim = periodos_inseridos[nome_norm]
+            disp = f"{disp_base} - {formatar_periodo(ini, fim)}"
+        else:
+            disp = disp_base
+
+        if "presente" in status.lower():
+            categorias_dados[categoria]["presentes"].append((rank, disp_base))
+        else:
+            categorias_dados[categoria]["afastamentos"].setdefault(status, []).append(
+                (rank, disp)
+            )
+
+    return categorias_dados, faltantes_por_secao, militares_nao_informados
+
+
+def gerar_anuncio(
+    data_formatada:      str,
+    categorias_dados:    Dict,
+    faltantes_por_secao: Dict
+) -> Tuple[str, int, int]:
+    partes = ["Sr. Cel DAL, bom dia!\n", "Anúncio CSC-PM", data_formatada, ""]
+    total_militares = total_civis = 0
+
+    for categoria in ["OFICIAIS", "PRAÇAS", "CIVIS"]:
+        d = categorias_dados[categoria]
+        if categoria == "CIVIS":
+            total_civis = len(d["presentes"])
+        else:
+            total_militares += len(d["presentes"])
+
+        partes += [f"*{categoria}*", "Efetivo total: ", f"🔸{d['total']} - CSC-PM", ""]
+
+        if d["presentes"]:
+            presentes = sorted(d["presentes"], key=lambda x: (x[0], x[1]))
+            partes.append(f"🔹{len(presentes)} Presentes:")
+            partes += [f"    {i}. {t}" for i, (_, t) in enumerate(presentes, 1)]
+            partes.append("")
+
+        for status in sorted(d["afastamentos"], key=ordem_status):
+            lista = sorted(d["afastamentos"][status], key=lambda x: (x[0], x[1]))
+            partes.append(f"🔹{len(lista)} {status}")
+            partes += [f"    {i}. {t}" for i, (_, t) in enumerate(lista, 1)]
+            partes.append("")
+
+        partes.append("")
+
+    if faltantes_por_secao:
+        itens = sorted(faltantes_por_secao.items(), key=lambda x: (-x[1], x[0]))
+        partes.append(f"❌ Seções sem resposta ({len(itens)}):")
+        for secao, qtd in itens:
+            partes.append(f"➡️ {secao} ({qtd} servidores no total);")
+        partes.append("")
+
+    partes += [
+        "Anúncio passado:",
+        "[PREENCHER MANUALMENTE]",
+        "[PREENCHER HORA]",
+        "➖➖➖➖➖ ➖ ➖",
+        "*Efetivo presente*:",
+        f"*Militares: {total_militares}*",
+        f"*Civis: {total_civis}*",
+    ]
+    return "\n".join(partes), total_militares, total_civis
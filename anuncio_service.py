@@ -0,0 +1,409 @@
+"""
+Serviço HTTP/JSON local com o anúncio do dia.
+
+Expõe o texto do anúncio e as contagens (`total_militares`, `total_civis`,
+`faltantes_por_secao` e a lista de quem ainda não respondeu) para o bot e a
+intranet, sem passar pela página Streamlit. Usa as mesmas funções de
+processamento de `anuncio_core`.
+
+Os resultados ficam em cache por (hash do conteúdo da planilha, data,
+períodos); só contam os períodos de quem está em férias/licença no dia.
+A planilha é baixada no máximo uma vez a cada `--intervalo` segundos;
+quando o conteúdo muda, o cache inteiro é descartado.
+
+Uso:
+    python anuncio_service.py [--port 8502] [--sheet-url URL | --export-url URL]
+
+Endpoints:
+    GET /anuncio?data=AAAA-MM-DD&periodo=CHAVE:AAAA-MM-DD:AAAA-MM-DD
+        `data` é opcional (padrão: hoje); `periodo` pode se repetir, uma vez
+        por militar em férias/licença (CHAVE = nome normalizado).
+    GET /saude
+"""
+import argparse
+import hashlib
+import json
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from datetime import date, datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from anuncio_core import (
+    DEFAULT_SHEET_URL,
+    carregar_efetivo_do_df,
+    extrair_sheet_id,
+    filtrar_respostas_do_dia,
+    formatar_nome_posto_somente_negritos,
+    gerar_anuncio,
+    ler_abas_obrigatorias,
+    montar_url_export,
+    organizar_categorias,
+    precisa_periodo,
+    preparar_formulario,
+    processar_respostas,
+)
+
+
+# =========================
+# FONTE (EXPORT DO SHEETS)
+# =========================
+class ErroFonte(Exception):
+    """Falha ao baixar o export da planilha."""
+
+
+class FontePlanilha:
+    """
+    Baixa o XLSX exportado e guarda (hash, bytes) por `intervalo` segundos.
+
+    Apenas uma thread baixa por vez; enquanto isso, as demais continuam
+    recebendo o conteúdo anterior. Se o download falhar e já houver conteúdo,
+    o conteúdo anterior continua sendo servido até a próxima tentativa. Sem
+    conteúdo, a falha é repassada a quem estava esperando e a quem chegar nos
+    `espera_falha` segundos seguintes, sem novo download.
+    """
+
+    def __init__(
+        self,
+        export_url:   str,
+        intervalo:    float = 60.0,
+        timeout:      float = 30.0,
+        espera_falha: float = 5.0,
+    ):
+        self.export_url   = export_url
+        self.intervalo    = intervalo
+        self.timeout      = timeout
+        self.espera_falha = espera_falha
+        self._atual: Optional[Tuple[str, bytes, float]] = None
+        self._falha: Optional[Tuple[str, float]] = None
+        self._lock = threading.Lock()
+
+    def _fresco(self, atual: Optional[Tuple[str, bytes, float]]) -> bool:
+        return atual is not None and time.monotonic() - atual[2] < self.intervalo
+
+    def _verificar_falha(self):
+        falha = self._falha
+        if falha is not None and time.monotonic() - falha[1] < self.espera_falha:
+            raise ErroFonte(falha[0])
+
+    def _baixar(self) -> bytes:
+        import requests
+
+        try:
+            r = requests.get(self.export_url, timeout=self.timeout)
+            r.raise_for_status()
+        except (requests.RequestException, OSError) as e:
+            raise ErroFonte(f"Falha ao obter a planilha: {e}") from e
+        return r.content
+
+    def obter(self) -> Tuple[str, bytes]:
+        atual = self._atual
+        if self._fresco(atual):
+            return atual[0], atual[1]
+
+        # Outra thread já está atualizando: serve o conteúdo anterior
+        if atual is not None and not self._lock.acquire(blocking=False):
+            return atual[0], atual[1]
+        if atual is None:
+            self._verificar_falha()
+            self._lock.acquire()
+
+        try:
+            atual = self._atual
+            if self._fresco(atual):
+                return atual[0], atual[1]
+            if atual is None:
+                # Quem esperava o download que acabou de falhar não tenta de novo
+                self._verificar_falha()
+            try:
+                conteudo = self._baixar()
+            except ErroFonte as e:
+                self._falha = (str(e), time.monotonic())
+                if atual is None:
+                    raise
+                self._atual = (atual[0], atual[1], time.monotonic())
+                return atual[0], atual[1]
+            self._falha = None
+            self._atual = (hashlib.sha256(conteudo).hexdigest(), conteudo, time.monotonic())
+            return self._atual[0], self._atual[1]
+        finally:
+            self._lock.release()
+
+
+# =========================
+# PROCESSAMENTO COM CACHE
+# =========================
+class ErroPlanilha(Exception):
+    """A planilha baixada não tem as abas ou colunas esperadas."""
+
+
+def parse_periodos(valores) -> Dict[str, Tuple[date, date]]:
+    """Converte parâmetros `CHAVE:AAAA-MM-DD:AAAA-MM-DD` em {chave: (inicio, fim)}."""
+    periodos = {}
+    for valor in valores:
+        partes = str(valor).rsplit(":", 2)
+        if len(partes) != 3:
+            raise ValueError(f"Período inválido: '{valor}' (use CHAVE:AAAA-MM-DD:AAAA-MM-DD)")
+        chave, ini, fim = partes
+        inicio, termino = date.fromisoformat(ini), date.fromisoformat(fim)
+        if termino < inicio:
+            raise ValueError(f"Período inválido para '{chave}': fim anterior ao início.")
+        periodos[chave.strip()] = (inicio, termino)
+    return periodos
+
+
+class ServicoAnuncio:
+    """
+    Monta o resultado JSON do dia a partir da planilha, com três níveis de cache:
+    planilha lida (por hash), respostas do dia (por hash e data) e resultado
+    final serializado (por hash, data e períodos). Os dois últimos guardam no
+    máximo `max_resultados` entradas cada, descartando as menos usadas.
+    """
+
+    def __init__(self, fonte: FontePlanilha, max_resultados: int = 256):
+        self.fonte          = fonte
+        self.max_resultados = max_resultados
+        self.calculos       = 0
+        self._hash: Optional[str] = None
+        self._erro_planilha: Optional[Tuple[str, str]] = None
+        self._df_formulario = None
+        self._efetivo_dict: Dict = {}
+        self._respostas: "OrderedDict[date, Tuple[int, Dict, frozenset]]" = OrderedDict()
+        self._resultados: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._lock_cache   = threading.Lock()
+        self._lock_calculo = threading.Lock()
+
+    def _carregar_planilha(self, hash_fonte: str, conteudo: bytes):
+        """Lê a planilha se o hash mudou, descartando tudo o que veio da versão anterior."""
+        if hash_fonte == self._hash:
+            return
+        self._verificar_erro(hash_fonte)
+
+        try:
+            df_formulario, df_efetivo_raw = ler_abas_obrigatorias(conteudo)
+            df_formulario = preparar_formulario(df_formulario)
+            efetivo_dict  = carregar_efetivo_do_df(df_efetivo_raw)
+        except ValueError as e:
+            # Guarda a falha: a mesma versão da planilha não é lida de novo
+            self._erro_planilha = (hash_fonte, str(e))
+            raise ErroPlanilha(str(e)) from e
+
+        with self._lock_cache:
+            self._resultados.clear()
+            self._respostas     = OrderedDict()
+            self._df_formulario = df_formulario
+            self._efetivo_dict  = efetivo_dict
+            self._hash          = hash_fonte
+            self._erro_planilha = None
+
+    def _verificar_erro(self, hash_fonte: str):
+        erro = self._erro_planilha
+        if erro is not None and erro[0] == hash_fonte:
+            raise ErroPlanilha(erro[1])
+
+    def _respostas_do_dia(self, dia: date) -> Tuple[int, Dict, frozenset]:
+        """(registros, respostas_dict, chaves de quem precisa de período) do dia."""
+        with self._lock_cache:
+            if dia in self._respostas:
+                self._respostas.move_to_end(dia)
+                return self._respostas[dia]
+
+        df_hoje        = filtrar_respostas_do_dia(self._df_formulario, dia)
+        respostas_dict = processar_respostas(df_hoje, self._efetivo_dict)
+        afastados      = frozenset(
+            chave for chave, resp in respostas_dict.items() if precisa_periodo(resp["status"])
+        )
+        with self._lock_cache:
+            self._respostas[dia] = (len(df_hoje), respostas_dict, afastados)
+            while len(self._respostas) > self.max_resultados:
+                self._respostas.popitem(last=False)
+            return self._respostas[dia]
+
+    @staticmethod
+    def _chave_periodos(periodos: Dict[str, Tuple[date, date]], afastados: frozenset) -> Tuple:
+        """Só os períodos de quem está afastado no dia entram no resultado e na chave."""
+        return tuple(sorted((k, ini, fim) for k, (ini, fim) in periodos.items() if k in afastados))
+
+    def _calcular(self, hash_fonte: str, dia: date, periodos: Dict[str, Tuple[date, date]]) -> bytes:
+        registros, respostas_dict, _ = self._respostas_do_dia(dia)
+
+        categorias_dados, faltantes_por_secao, militares_nao_informados = organizar_categorias(
+            self._efetivo_dict, respostas_dict, periodos
+        )
+        anuncio, total_militares, total_civis = gerar_anuncio(
+            dia.strftime("%d/%m/%Y"), categorias_dados, faltantes_por_secao
+        )
+
+        afastados = []
+        for chave, resp in respostas_dict.items():
+            if not precisa_periodo(resp["status"]):
+                continue
+            periodo = periodos.get(chave)
+            afastados.append({
+                "chave":   chave,
+                "nome":    formatar_nome_posto_somente_negritos(resp["dados"]),
+                "status":  resp["status"],
+                "periodo": [periodo[0].isoformat(), periodo[1].isoformat()] if periodo else None,
+            })
+
+        resultado = {
+            "data":                     dia.isoformat(),
+            "fonte":                    hash_fonte,
+            "registros":                registros,
+            "anuncio":                  anuncio,
+            "total_militares":          total_militares,
+            "total_civis":              total_civis,
+            "faltantes_por_secao":      faltantes_por_secao,
+            "militares_nao_informados": sorted(militares_nao_informados),
+            "afastados":                afastados,
+        }
+        return json.dumps(resultado, ensure_ascii=False).encode("utf-8")
+
+    def resultado_json(self, dia: date, periodos: Dict[str, Tuple[date, date]]) -> bytes:
+        hash_fonte, _ = self.fonte.obter()
+        self._verificar_erro(hash_fonte)
+
+        with self._lock_cache:
+            dia_em_cache = self._respostas.get(dia) if hash_fonte == self._hash else None
+            if dia_em_cache is not None:
+                chave = (hash_fonte, dia, self._chave_periodos(periodos, dia_em_cache[2]))
+                if chave in self._resultados:
+                    self._resultados.move_to_end(chave)
+                    return self._resultados[chave]
+
+        with self._lock_calculo:
+            # Reconsulta a fonte: outra thread pode já ter trocado de versão
+            hash_fonte, conteudo = self.fonte.obter()
+            self._carregar_planilha(hash_fonte, conteudo)
+            _, _, afastados = self._respostas_do_dia(dia)
+            chave_periodos  = self._chave_periodos(periodos, afastados)
+            chave = (hash_fonte, dia, chave_periodos)
+            with self._lock_cache:
+                if chave in self._resultados:
+                    return self._resultados[chave]
+
+            periodos = {k: (ini, fim) for k, ini, fim in chave_periodos}
+            corpo = self._calcular(hash_fonte, dia, periodos)
+            self.calculos += 1
+
+            with self._lock_cache:
+                self._resultados[chave] = corpo
+                while len(self._resultados) > self.max_resultados:
+                    self._resultados.popitem(last=False)
+        return corpo
+
+
+# =========================
+# HTTP
+# =========================
+class AnuncioHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabeçalho e corpo saem em writes separados; sem isso, keep-alive espera o ACK atrasado
+    disable_nagle_algorithm = True
+    servico: ServicoAnuncio = None
+    registrar_acessos = True
+
+    def _responder(self, status: HTTPStatus, corpo: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _erro(self, status: HTTPStatus, mensagem: str):
+        corpo = json.dumps({"erro": mensagem}, ensure_ascii=False).encode("utf-8")
+        self._responder(status, corpo)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/saude":
+            self._responder(HTTPStatus.OK, b'{"ok": true}')
+            return
+        if url.path != "/anuncio":
+            self._erro(HTTPStatus.NOT_FOUND, f"Rota desconhecida: {url.path}")
+            return
+
+        params = parse_qs(url.query)
+        try:
+            dia      = date.fromisoformat(params["data"][0]) if "data" in params else datetime.now().date()
+            periodos = parse_periodos(params.get("periodo", []))
+        except ValueError as e:
+            self._erro(HTTPStatus.BAD_REQUEST, str(e))
+            return
+
+        try:
+            corpo = self.servico.resultado_json(dia, periodos)
+        except ErroFonte as e:
+            self._erro(HTTPStatus.BAD_GATEWAY, str(e))
+            return
+        except ErroPlanilha as e:
+            self._erro(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+            return
+        except Exception as e:
+            self.log_error("Erro ao montar o anúncio:\n%s", traceback.format_exc())
+            self._erro(HTTPStatus.INTERNAL_SERVER_ERROR, f"Erro interno: {type(e).__name__}")
+            return
+        self._responder(HTTPStatus.OK, corpo)
+
+    def log_message(self, format, *args):
+        if self.registrar_acessos:
+            super().log_message(format, *args)
+
+    def log_error(self, format, *args):
+        # Erros são registrados mesmo com --silencioso
+        super().log_message(format, *args)
+
+
+def criar_servidor(
+    servico: ServicoAnuncio,
+    host: str = "127.0.0.1",
+    port: int = 8502,
+    registrar_acessos: bool = True,
+) -> ThreadingHTTPServer:
+    handler = type(
+        "AnuncioHandlerConfigurado",
+        (AnuncioHandler,),
+        {"servico": servico, "registrar_acessos": registrar_acessos},
+    )
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serviço HTTP/JSON do anúncio CSC-PM")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--sheet-url", default=DEFAULT_SHEET_URL)
+    parser.add_argument("--export-url", help="URL direta do XLSX (sobrepõe --sheet-url)")
+    parser.add_argument("--intervalo", type=float, default=60.0,
+                        help="Segundos entre downloads da planilha")
+    parser.add_argument("--silencioso", action="store_true", help="Não registrar cada acesso")
+    args = parser.parse_args()
+
+    export_url = args.export_url
+    if not export_url:
+        sheet_id = extrair_sheet_id(args.sheet_url)
+        if not sheet_id:
+            print("Não foi possível extrair o ID da planilha.", file=sys.stderr)
+            return 2
+        export_url = montar_url_export(sheet_id)
+
+    servico  = ServicoAnuncio(FontePlanilha(export_url, intervalo=args.intervalo))
+    servidor = criar_servidor(servico, args.host, args.port, not args.silencioso)
+    print(f"Servindo em http://{args.host}:{servidor.server_address[1]}/anuncio")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
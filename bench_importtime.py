@@ -0,0 +1,90 @@
+"""
+Benchmark de tempo de importação do núcleo (anuncio_core).
+
+Executa `python -X importtime -c "import anuncio_core"` várias vezes em
+subprocessos novos e compara a mediana do tempo cumulativo com um orçamento.
+Falha (código de saída 1) se o orçamento for ultrapassado ou se o núcleo
+puxar alguma dependência pesada durante a importação.
+
+Uso:
+    python bench_importtime.py [--budget-ms 12] [--runs 7]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+MODULO_ALVO = "anuncio_core"
+
+# Módulos que o núcleo nunca deve importar no carregamento
+MODULOS_PROIBIDOS = ("streamlit", "pandas", "requests", "difflib", "numpy")
+
+ORCAMENTO_PADRAO_MS = float(os.environ.get("ANUNCIO_CORE_IMPORT_BUDGET_MS", "12"))
+
+
+def medir_importacao(modulo: str) -> Tuple[float, List[str]]:
+    """
+    Importa `modulo` num interpretador novo e retorna
+    (tempo cumulativo em ms, lista de módulos importados).
+    """
+    raiz = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=raiz, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {modulo}:\n{proc.stderr}")
+
+    cumulativos: Dict[str, int] = {}
+    importados = []
+    for linha in proc.stderr.splitlines():
+        if not linha.startswith("import time:"):
+            continue
+        campos = linha[len("import time:"):].split("|")
+        if len(campos) != 3 or not campos[1].strip().isdigit():
+            continue  # cabeçalho
+        nome = campos[2].strip()
+        cumulativos[nome] = int(campos[1])
+        importados.append(nome)
+
+    if modulo not in cumulativos:
+        raise RuntimeError(f"{modulo} não apareceu na saída de -X importtime.")
+    return cumulativos[modulo] / 1000.0, importados
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=ORCAMENTO_PADRAO_MS)
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    tempos, importados = [], []
+    for _ in range(max(1, args.runs)):
+        ms, importados = medir_importacao(MODULO_ALVO)
+        tempos.append(ms)
+
+    mediana = statistics.median(tempos)
+    print(
+        f"{MODULO_ALVO}: mediana {mediana:.2f} ms "
+        f"(min {min(tempos):.2f} / max {max(tempos):.2f}, {len(tempos)} execuções) "
+        f"— orçamento {args.budget_ms:.2f} ms"
+    )
+
+    ok = True
+    proibidos = sorted({m.split(".")[0] for m in importados} & set(MODULOS_PROIBIDOS))
+    if proibidos:
+        print(f"❌ {MODULO_ALVO} importou dependências pesadas: {', '.join(proibidos)}")
+        ok = False
+    if mediana > args.budget_ms:
+        print(f"❌ Tempo de importação acima do orçamento ({mediana:.2f} ms > {args.budget_ms:.2f} ms)")
+        ok = False
+
+    if ok:
+        print("✅ Dentro do orçamento.")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
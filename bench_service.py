@@ -0,0 +1,92 @@
+"""
+Teste de carga do serviço HTTP/JSON (anuncio_service) contra um export local.
+
+Sobe um servidor que imita o export XLSX do Google Sheets (servindo um
+arquivo dado por `--xlsx` ou uma planilha sintética), aponta o serviço para
+ele e dispara requisições concorrentes em `/anuncio`. Ao final informa vazão,
+latências e quantas vezes a planilha foi baixada e processada.
+
+Uso:
+    python bench_service.py [--xlsx planilha.xlsx] [--threads 16] [--requisicoes 200]
+"""
+import argparse
+import http.client
+import statistics
+import sys
+import threading
+import time
+from typing import List
+
+from anuncio_service import FontePlanilha, ServicoAnuncio, criar_servidor
+from tests.apoio import gerar_planilha_sintetica, subir_export_local
+
+def disparar(porta: int, n: int, latencias: List[float], erros: List[str]):
+    conn = http.client.HTTPConnection("127.0.0.1", porta, timeout=60)
+    try:
+        for _ in range(n):
+            t0 = time.perf_counter()
+            conn.request("GET", "/anuncio")
+            resp = conn.getresponse()
+            corpo = resp.read()
+            latencias.append(time.perf_counter() - t0)
+            if resp.status != 200:
+                erros.append(f"{resp.status}: {corpo[:200]!r}")
+    finally:
+        conn.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--xlsx", help="Planilha XLSX a servir (padrão: sintética)")
+    parser.add_argument("--servidores", type=int, default=120, help="Tamanho do efetivo sintético")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requisicoes", type=int, default=200, help="Requisições por thread")
+    args = parser.parse_args()
+
+    if args.xlsx:
+        with open(args.xlsx, "rb") as f:
+            conteudo = f.read()
+    else:
+        conteudo = gerar_planilha_sintetica(args.servidores)
+
+    export  = subir_export_local(conteudo)
+    fonte   = FontePlanilha(f"http://127.0.0.1:{export.server_address[1]}/export?format=xlsx")
+    servico = ServicoAnuncio(fonte)
+    servidor = criar_servidor(servico, port=0, registrar_acessos=False)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    porta = servidor.server_address[1]
+
+    latencias: List[float] = []
+    erros: List[str] = []
+    threads = [
+        threading.Thread(target=disparar, args=(porta, args.requisicoes, latencias, erros))
+        for _ in range(args.threads)
+    ]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duracao = time.perf_counter() - inicio
+
+    servidor.shutdown()
+    export.shutdown()
+
+    latencias.sort()
+    total = len(latencias)
+    print(f"{total} requisições em {duracao:.2f} s ({total / duracao:.0f} req/s), {args.threads} threads")
+    print(
+        f"latência: p50 {statistics.median(latencias) * 1000:.2f} ms | "
+        f"p95 {latencias[int(total * 0.95) - 1] * 1000:.2f} ms | "
+        f"máx {latencias[-1] * 1000:.2f} ms"
+    )
+    print(f"downloads do export: {export.acessos} | processamentos: {servico.calculos}")
+
+    if erros:
+        print(f"❌ {len(erros)} erro(s). Primeiro: {erros[0]}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
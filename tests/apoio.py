@@ -0,0 +1,76 @@
+"""
+Apoio aos testes e ao benchmark do serviço: planilha sintética no formato
+esperado e um servidor local que imita o export XLSX do Google Sheets.
+"""
+import io
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from anuncio_core import ABA_EFETIVO, ABA_FORMULARIO
+
+POSTOS = [("*1º TEN*", "QOPM"), ("*CAP*", "QOPM"), ("*2º SGT*", "QPPM"),
+          ("*CB*", "QPPM"), ("*SD*", "QPPM"), ("", "CIVIL")]
+RESPOSTAS = ["Presente", "Presente", "Férias", "Folga", "Dispensa"]
+
+
+def gerar_planilha_sintetica(n_servidores: int = 120, n_secoes: int = 8) -> bytes:
+    """Gera um XLSX com as abas de efetivo e de formulário no formato esperado."""
+    import pandas as pd
+
+    efetivo, colunas_nomes = [], []
+    for i in range(n_servidores):
+        posto, quadro = POSTOS[i % len(POSTOS)]
+        nome = f"*SERVIDOR* {chr(65 + i % 26)}{chr(65 + i // 26 % 26)} de *TESTE{i}*"
+        efetivo.append({
+            "SEÇÃO":  f"S{i % n_secoes}",
+            "NÚMERO": f"{100000 + i}",
+            "P / G":  posto,
+            "QUADRO": quadro,
+            "NOME":   nome,
+        })
+        colunas_nomes.append(f"{posto.strip('*')} PM {nome.replace('*', '')}")
+
+    agora = datetime.now()
+    formulario = []
+    for s in range(n_secoes - 1):  # uma seção fica sem resposta
+        linha = {
+            "Carimbo de data/hora": agora.strftime("%d/%m/%Y %H:%M:%S"),
+            "Data do anúncio":      agora.strftime("%d/%m/%Y"),
+            "Seção:":               f"S{s}",
+            "Observação":           "",
+        }
+        for i, col in enumerate(colunas_nomes):
+            linha[col] = RESPOSTAS[i % len(RESPOSTAS)] if i % n_secoes == s else ""
+        formulario.append(linha)
+
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        pd.DataFrame(formulario).to_excel(writer, sheet_name=ABA_FORMULARIO, index=False)
+        pd.DataFrame(efetivo).to_excel(writer, sheet_name=ABA_EFETIVO, index=False)
+    return buf.getvalue()
+
+
+def subir_export_local(conteudo: bytes) -> ThreadingHTTPServer:
+    """
+    Servidor que responde qualquer GET com o XLSX, contando os acessos.
+    O conteúdo servido pode ser trocado em `servidor.conteudo`.
+    """
+    class ExportHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.server.acessos += 1
+            conteudo = self.server.conteudo
+            self.send_response(200)
+            self.send_header("Content-Type", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+            self.send_header("Content-Length", str(len(conteudo)))
+            self.end_headers()
+            self.wfile.write(conteudo)
+
+        def log_message(self, format, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), ExportHandler)
+    servidor.acessos  = 0
+    servidor.conteudo = conteudo
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
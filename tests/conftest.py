@@ -0,0 +1,8 @@
+import pytest
+
+from tests.apoio import gerar_planilha_sintetica
+
+
+@pytest.fixture(scope="session")
+def planilha():
+    return gerar_planilha_sintetica(60)
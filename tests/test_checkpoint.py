@@ -0,0 +1,123 @@
+import io
+import pickle
+import zlib
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pytest
+
+import anuncio_checkpoint as ck
+from anuncio_core import ABA_EFETIVO, ABA_FORMULARIO, ler_abas_obrigatorias
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("ANUNCIO_CHECKPOINT_DIR", str(tmp_path))
+    monkeypatch.setattr(ck, "CHECKPOINT_DIR", str(tmp_path))
+    return tmp_path
+
+
+def alterar_formulario(conteudo: bytes, valor: str) -> bytes:
+    df_formulario, df_efetivo_raw = ler_abas_obrigatorias(conteudo)
+    df_formulario.iloc[0, 5] = valor
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        df_formulario.to_excel(writer, sheet_name=ABA_FORMULARIO, index=False)
+        df_efetivo_raw.to_excel(writer, sheet_name=ABA_EFETIVO, index=False)
+    return buf.getvalue()
+
+
+def test_etapas_refeitas(planilha):
+    hoje = datetime.now().date()
+
+    estado, refeitas = ck.atualizar_estado(planilha, hoje, origem="url")
+    assert refeitas == ["efetivo", "cabecalhos", "respostas"]
+    assert estado["origem"] == "url"
+
+    mesmo, refeitas = ck.atualizar_estado(planilha, hoje, estado, origem="url")
+    assert mesmo is estado and refeitas == []
+
+    _, refeitas = ck.atualizar_estado(alterar_formulario(planilha, "Ausente"), hoje, estado)
+    assert refeitas == ["respostas"]
+
+    _, refeitas = ck.atualizar_estado(planilha, hoje + timedelta(days=1), estado)
+    assert refeitas == ["respostas"]
+
+
+def test_periodos_sobrevivem_somente_sem_mudanca_nas_respostas(planilha):
+    hoje = datetime.now().date()
+    estado, _ = ck.atualizar_estado(planilha, hoje)
+    estado["periodos_aplicados"] = True
+    estado["periodos_inseridos"] = {"X": (date(2026, 10, 1), date(2026, 10, 30))}
+
+    outra_origem, _ = ck.atualizar_estado(planilha, hoje, estado, origem="upload: a.xlsx")
+    assert outra_origem["periodos_aplicados"] and outra_origem["origem"] == "upload: a.xlsx"
+
+    novo, _ = ck.atualizar_estado(alterar_formulario(planilha, "Ausente"), hoje, estado)
+    assert not novo["periodos_aplicados"] and novo["periodos_inseridos"] == {}
+
+    limpo = ck.descartar_periodos(estado)
+    assert not limpo["periodos_aplicados"] and limpo["respostas_dict"] is estado["respostas_dict"]
+    assert estado["periodos_aplicados"]
+
+
+def test_salvar_e_carregar(planilha, checkpoint_dir):
+    hoje = datetime.now().date()
+    estado, _ = ck.atualizar_estado(planilha, hoje, origem="url")
+
+    caminho = ck.salvar_checkpoint(estado)
+    assert caminho.startswith(str(checkpoint_dir))
+    assert [p.name for p in checkpoint_dir.iterdir()] == [f"anuncio_{hoje.strftime('%Y%m%d')}.ckpt"]
+
+    carregado = ck.carregar_checkpoint(hoje)
+    assert carregado == estado
+    assert ck.atualizar_estado(planilha, hoje, carregado, origem="url") == (carregado, [])
+    assert ck.carregar_checkpoint(hoje + timedelta(days=1)) is None
+
+
+def test_checkpoint_corrompido(planilha):
+    hoje = datetime.now().date()
+    caminho = ck.salvar_checkpoint(ck.atualizar_estado(planilha, hoje)[0])
+
+    with open(caminho, "r+b") as f:
+        f.seek(10)
+        f.write(b"lixo")
+    assert ck.carregar_checkpoint(hoje) is None
+
+    with open(caminho, "wb") as f:
+        f.write(b"XXXX")
+    assert ck.carregar_checkpoint(hoje) is None
+
+
+def test_mantem_apenas_os_mais_recentes(planilha, checkpoint_dir):
+    estado, _ = ck.atualizar_estado(planilha, datetime.now().date())
+    for d in range(ck.CHECKPOINTS_MANTIDOS + 3):
+        ck.salvar_checkpoint(dict(estado, dia=date(2026, 1, 1) + timedelta(days=d)))
+
+    assert len(list(checkpoint_dir.glob("*.ckpt"))) == ck.CHECKPOINTS_MANTIDOS
+    assert not list(checkpoint_dir.glob("*.tmp"))
+
+
+def test_datas_e_periodos_sobrevivem_ao_disco(planilha):
+    hoje = datetime.now().date()
+    estado, _ = ck.atualizar_estado(planilha, hoje, origem="url")
+    estado = dict(
+        estado,
+        periodos_aplicados=True,
+        periodos_inseridos={"X": (date(2026, 10, 1), date(2026, 10, 30))},
+    )
+    ck.salvar_checkpoint(estado)
+
+    carregado = ck.carregar_checkpoint(hoje)
+    assert carregado == estado
+    assert isinstance(carregado["dia"], date)
+    assert carregado["periodos_inseridos"]["X"] == (date(2026, 10, 1), date(2026, 10, 30))
+
+
+def test_pickle_nao_e_executado(planilha):
+    hoje    = datetime.now().date()
+    caminho = ck.salvar_checkpoint(ck.atualizar_estado(planilha, hoje)[0])
+    with open(caminho, "wb") as f:
+        f.write(ck.MAGIC + bytes([ck.VERSAO]) + zlib.compress(pickle.dumps({"dia": hoje})))
+
+    assert ck.carregar_checkpoint(hoje) is None
@@ -0,0 +1,63 @@
+import hashlib
+import io
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from anuncio_core import (
+    carregar_efetivo_do_df,
+    filtrar_respostas_do_dia,
+    gerar_anuncio,
+    ler_abas_obrigatorias,
+    organizar_categorias,
+    preparar_formulario,
+    processar_respostas,
+    resolver_cabecalhos,
+)
+
+# Valores obtidos com a versão monolítica de anuncio_csc.py sobre a mesma planilha
+ANUNCIO_SHA256  = "8b7868a7d360d56867c64fd49d9eda491f6089825ff445d0455e17ca679c4eed"
+FALTANTES_SHA256 = "b5788a7572943be50bb740dcbf574a9645ce03493170f2b5da3e0d0b5e9078cd"
+
+
+@pytest.fixture(scope="module")
+def dados(planilha):
+    df_formulario, df_efetivo_raw = ler_abas_obrigatorias(planilha)
+    efetivo_dict = carregar_efetivo_do_df(df_efetivo_raw)
+    df_hoje = filtrar_respostas_do_dia(preparar_formulario(df_formulario), datetime.now().date())
+    return efetivo_dict, df_hoje
+
+
+def test_anuncio_igual_ao_original(dados):
+    efetivo_dict, df_hoje = dados
+    respostas_dict = processar_respostas(df_hoje, efetivo_dict)
+    categorias_dados, faltantes_por_secao, nao_informados = organizar_categorias(
+        efetivo_dict, respostas_dict, {}
+    )
+    anuncio, total_militares, total_civis = gerar_anuncio(
+        "19/10/2026", categorias_dados, faltantes_por_secao
+    )
+
+    assert (len(efetivo_dict), len(respostas_dict)) == (60, 53)
+    assert (total_militares, total_civis) == (17, 4)
+    assert faltantes_por_secao == {"S7": 7}
+    assert hashlib.sha256(anuncio.encode()).hexdigest() == ANUNCIO_SHA256
+    assert hashlib.sha256(repr(sorted(nao_informados)).encode()).hexdigest() == FALTANTES_SHA256
+
+
+def test_cabecalhos_pre_resolvidos(dados):
+    efetivo_dict, df_hoje = dados
+    cabecalhos = resolver_cabecalhos(df_hoje.columns, efetivo_dict)
+
+    assert len(cabecalhos) == len(df_hoje.columns) - 4
+    assert processar_respostas(df_hoje, efetivo_dict, cabecalhos) == processar_respostas(df_hoje, efetivo_dict)
+
+
+def test_abas_obrigatorias_ausentes():
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        pd.DataFrame({"a": [1]}).to_excel(writer, sheet_name="Outra", index=False)
+
+    with pytest.raises(ValueError, match="Aba de formulário não encontrada"):
+        ler_abas_obrigatorias(buf.getvalue())
@@ -0,0 +1,241 @@
+import http.client
+import io
+import json
+import socket
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pytest
+
+import anuncio_service
+from anuncio_core import ABA_EFETIVO
+from anuncio_service import ErroFonte, ErroPlanilha, FontePlanilha, ServicoAnuncio, criar_servidor
+from tests.apoio import gerar_planilha_sintetica, subir_export_local
+
+
+@pytest.fixture
+def export(planilha):
+    servidor = subir_export_local(planilha)
+    yield servidor
+    servidor.shutdown()
+
+
+def url_export(servidor) -> str:
+    return f"http://127.0.0.1:{servidor.server_address[1]}/export?format=xlsx"
+
+
+@pytest.fixture
+def http_servico():
+    servidores = []
+
+    def subir(servico):
+        servidor = criar_servidor(servico, port=0, registrar_acessos=False)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        servidores.append(servidor)
+        return servidor.server_address[1]
+
+    yield subir
+    for s in servidores:
+        s.shutdown()
+
+
+def get(porta: int, caminho: str):
+    conn = http.client.HTTPConnection("127.0.0.1", porta, timeout=30)
+    try:
+        conn.request("GET", caminho)
+        resp = conn.getresponse()
+        return resp.status, json.loads(resp.read())
+    finally:
+        conn.close()
+
+
+def planilha_sem_formulario() -> bytes:
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        pd.DataFrame({"NOME": ["X"]}).to_excel(writer, sheet_name=ABA_EFETIVO, index=False)
+    return buf.getvalue()
+
+
+def contar_leituras(monkeypatch) -> list:
+    leituras = []
+    original = anuncio_service.ler_abas_obrigatorias
+
+    def contando(conteudo):
+        leituras.append(1)
+        return original(conteudo)
+
+    monkeypatch.setattr(anuncio_service, "ler_abas_obrigatorias", contando)
+    return leituras
+
+
+def test_resultado_reaproveita_cache(export):
+    servico = ServicoAnuncio(FontePlanilha(url_export(export), intervalo=60))
+    hoje    = datetime.now().date()
+
+    r1 = json.loads(servico.resultado_json(hoje, {}))
+    r2 = json.loads(servico.resultado_json(hoje, {}))
+
+    assert r1 == r2
+    assert r1["registros"] == 7
+    assert r1["faltantes_por_secao"] == {"S7": 7}
+    assert servico.calculos == 1
+    assert export.acessos == 1
+
+
+def test_cache_refeito_quando_export_muda(export):
+    servico = ServicoAnuncio(FontePlanilha(url_export(export), intervalo=0))
+    hoje    = datetime.now().date()
+
+    r1 = json.loads(servico.resultado_json(hoje, {}))
+    export.conteudo = gerar_planilha_sintetica(30)
+    r2 = json.loads(servico.resultado_json(hoje, {}))
+
+    assert r1["fonte"] != r2["fonte"]
+    assert r2["faltantes_por_secao"] == {"S7": 3}
+    assert servico.calculos == 2
+    assert list(servico._resultados) == [(r2["fonte"], hoje, ())]
+
+
+def test_periodos_fazem_parte_da_chave(export):
+    servico = ServicoAnuncio(FontePlanilha(url_export(export), intervalo=60))
+    hoje    = datetime.now().date()
+
+    base  = json.loads(servico.resultado_json(hoje, {}))
+    chave = base["afastados"][0]["chave"]
+    com_periodo = json.loads(servico.resultado_json(hoje, {chave: (date(2026, 10, 1), date(2026, 10, 30))}))
+
+    assert "01/10/2026 a 30/10/2026" in com_periodo["anuncio"]
+    assert "01/10/2026 a 30/10/2026" not in base["anuncio"]
+    assert servico.calculos == 2
+
+
+def test_respostas_por_dia_limitadas(export):
+    servico = ServicoAnuncio(FontePlanilha(url_export(export), intervalo=60), max_resultados=2)
+    hoje    = datetime.now().date()
+
+    for d in range(5):
+        servico.resultado_json(hoje - timedelta(days=d), {})
+
+    assert len(servico._respostas) == 2
+    assert len(servico._resultados) == 2
+
+
+def test_http_erros(export, http_servico):
+    porta = http_servico(ServicoAnuncio(FontePlanilha(url_export(export))))
+
+    assert get(porta, "/saude") == (200, {"ok": True})
+    assert get(porta, "/anuncio?periodo=abc")[0] == 400
+    assert get(porta, "/nada")[0] == 404
+    assert get(porta, "/anuncio")[0] == 200
+
+
+def test_http_502_quando_export_indisponivel(http_servico):
+    porta = http_servico(ServicoAnuncio(FontePlanilha("http://127.0.0.1:9/export", timeout=2)))
+    assert get(porta, "/anuncio")[0] == 502
+
+
+def test_http_500_em_erro_de_processamento(export, http_servico, monkeypatch):
+    servico = ServicoAnuncio(FontePlanilha(url_export(export)))
+
+    def quebrar(*args):
+        raise KeyError("coluna")
+
+    monkeypatch.setattr(servico, "_calcular", quebrar)
+    porta = http_servico(servico)
+    status, corpo = get(porta, "/anuncio")
+    assert status == 500
+    assert corpo == {"erro": "Erro interno: KeyError"}
+
+
+def test_planilha_invalida_lida_uma_vez(export, planilha, monkeypatch):
+    leituras = contar_leituras(monkeypatch)
+    export.conteudo = planilha_sem_formulario()
+    servico = ServicoAnuncio(FontePlanilha(url_export(export), intervalo=0))
+    hoje    = datetime.now().date()
+
+    for _ in range(50):
+        with pytest.raises(ErroPlanilha, match="Aba de formulário não encontrada"):
+            servico.resultado_json(hoje, {})
+    assert len(leituras) == 1
+
+    export.conteudo = planilha
+    assert json.loads(servico.resultado_json(hoje, {}))["registros"] == 7
+    assert len(leituras) == 2
+
+
+def test_http_422_para_planilha_invalida(export, http_servico):
+    export.conteudo = planilha_sem_formulario()
+    porta = http_servico(ServicoAnuncio(FontePlanilha(url_export(export))))
+
+    status, corpo = get(porta, "/anuncio")
+    assert status == 422
+    assert "Aba de formulário não encontrada" in corpo["erro"]
+
+
+def test_http_500_para_value_error_no_processamento(export, http_servico, monkeypatch):
+    servico = ServicoAnuncio(FontePlanilha(url_export(export)))
+
+    def quebrar(*args):
+        raise ValueError("bug")
+
+    monkeypatch.setattr(servico, "_calcular", quebrar)
+    porta = http_servico(servico)
+    assert get(porta, "/anuncio") == (500, {"erro": "Erro interno: ValueError"})
+
+
+def test_falha_no_primeiro_download_nao_se_repete():
+    # Porta que aceita conexões mas nunca responde
+    ouvinte = socket.socket()
+    ouvinte.bind(("127.0.0.1", 0))
+    ouvinte.listen(64)
+    fonte = FontePlanilha(f"http://127.0.0.1:{ouvinte.getsockname()[1]}/export", timeout=1)
+
+    downloads = []
+    baixar = fonte._baixar
+
+    def contando():
+        downloads.append(1)
+        return baixar()
+
+    fonte._baixar = contando
+    erros = []
+
+    def ler():
+        try:
+            fonte.obter()
+        except ErroFonte as e:
+            erros.append(e)
+
+    try:
+        inicio  = time.monotonic()
+        leitores = [threading.Thread(target=ler) for _ in range(6)]
+        for t in leitores:
+            t.start()
+        for t in leitores:
+            t.join()
+        duracao = time.monotonic() - inicio
+
+        assert len(erros) == 6
+        assert len(downloads) == 1
+        assert duracao < 2.5
+
+        with pytest.raises(ErroFonte):
+            fonte.obter()
+        assert len(downloads) == 1
+    finally:
+        ouvinte.close()
+
+
+def test_periodos_de_quem_nao_esta_afastado_sao_ignorados(export):
+    servico = ServicoAnuncio(FontePlanilha(url_export(export), intervalo=60), max_resultados=4)
+    hoje    = datetime.now().date()
+    periodo = (date(2026, 10, 1), date(2026, 10, 30))
+
+    base = servico.resultado_json(hoje, {})
+    for i in range(300):
+        assert servico.resultado_json(hoje, {f"NAO EXISTE {i}": periodo}) == base
+
+    assert servico.calculos == 1
+    assert list(servico._resultados) == [(json.loads(base)["fonte"], hoje, ())]